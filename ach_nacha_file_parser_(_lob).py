@@ -9,6 +9,17 @@ Original file is located at
 
 # ach_parser.py
 import json
+import mmap
+import os
+import re
+from array import array
+from collections import namedtuple
+from functools import partial
+
+try:
+    import numpy as np
+except ImportError: # NumPy is optional; without it parse_ach_file_columnar builds its columns record by record
+    np = None
 
 # Define field mappings for each record type based on NACHA specifications.
 # Positions are 0-indexed for Python string slicing.
@@ -89,192 +100,666 @@ RECORD_DEFINITIONS = {
     }
 }
 
-def parse_record(line):
-    """Parses a single 94-character ACH record."""
+# Fields converted to int after slicing (amounts in cents, hashes and counts).
+INTEGER_FIELDS = frozenset([
+    'amount', 'total_debit_entry_dollar_amount', 'total_credit_entry_dollar_amount',
+    'entry_addenda_count', 'entry_hash', 'batch_count', 'block_count',
+    'total_debit_entry_dollar_amount_in_file', 'total_credit_entry_dollar_amount_in_file'
+])
+
+def _parse_ach_int(line, start, end):
+    """
+    Parses the numeric field line[start:end] (amounts in cents, hashes, counts).
+    int() takes the raw slice directly, since it ignores surrounding whitespace
+    and leading zeros itself, so no stripped copy is made for valid numbers;
+    blank fields are 0. Fields that are not integers are returned stripped, as
+    strings.
+    """
+    field = line[start:end]
+    try:
+        return int(field)
+    except ValueError:
+        return field.strip() or 0 # Keep as string if conversion fails
+
+# Fields that are never blank-padded, so need no strip(): the record type code is
+# the digit the layout was chosen by. (Numeric fields skip the strip as well, see
+# _parse_ach_int. Alphanumeric fields keep strip() on both sides: NACHA left-
+# justifies them, but some are blank-prefixed in practice, e.g. the immediate
+# destination ' 091000019', and rstrip(' ') measured no faster than strip().)
+UNPADDED_FIELDS = frozenset(['record_type_code'])
+
+# Precompiled layouts, indexed by int(record_type), without the description
+# strings. These drive the generated parsers below. Each entry is a tuple of
+# (field_name, start, end, convert, strip) where convert is _parse_ach_int for
+# INTEGER_FIELDS and None otherwise, and strip is False for UNPADDED_FIELDS. The
+# decisions are made here, once, rather than per field per line. (Membership in
+# INTEGER_FIELDS rather than a substring test on the name, since
+# 'dfi_account_number' contains 'count'.)
+_LAYOUTS = [None] * 10
+for _record_type, _definition in RECORD_DEFINITIONS.items():
+    _LAYOUTS[int(_record_type)] = tuple(
+        (name, start, end, _parse_ach_int if name in INTEGER_FIELDS else None, name not in UNPADDED_FIELDS)
+        for name, (start, end, _) in _definition.items()
+    )
+
+# Immutable record types for parse_record_tuple, keyed like RECORD_DEFINITIONS.
+# A namedtuple is a fraction of the size of the equivalent dict, which matters
+# for callers that hold on to many records.
+RECORD_TUPLES = {
+    '1': namedtuple('FileHeaderRecord', RECORD_DEFINITIONS['1']),
+    '5': namedtuple('BatchHeaderRecord', RECORD_DEFINITIONS['5']),
+    '6': namedtuple('EntryDetailRecord', RECORD_DEFINITIONS['6']),
+    '7': namedtuple('AddendaRecord', RECORD_DEFINITIONS['7']),
+    '8': namedtuple('BatchControlRecord', RECORD_DEFINITIONS['8']),
+    '9': namedtuple('FileControlRecord', RECORD_DEFINITIONS['9']),
+}
+
+def _compile_parser(record_type, layout, record_tuple=None, in_place=False):
+    """
+    Generates a straight-line parser for one record type, e.g. for '6':
+
+        def _parse_t6(line):
+            return {
+                'record_type_code': line[0:1],
+                ...
+                'amount': _parse_ach_int(line, 29, 39),
+                ...
+            }
+
+    so parse_record builds each record from a single dict literal instead of
+    looping over the layout for every line. With record_tuple, the generated
+    function calls record_tuple(...) with the same values positionally instead.
+    With in_place, it is _parse_t6(record, line) and assigns the values into the
+    given dict, which it returns.
+    """
+    values = []
+    for field_name, start, end, convert, strip in layout:
+        if convert is not None:
+            value = f"_parse_ach_int(line, {start}, {end})"
+        elif strip:
+            value = f"line[{start}:{end}].strip()"
+        else:
+            value = f"line[{start}:{end}]"
+        if in_place:
+            values.append(f"    record[{field_name!r}] = {value}")
+        elif record_tuple:
+            values.append(f"        {value},")
+        else:
+            values.append(f"        {field_name!r}: {value},")
+    if in_place:
+        source = f"def _parse_t{record_type}(record, line):\n" + "\n".join(values) + "\n    return record\n"
+    elif record_tuple:
+        source = f"def _parse_t{record_type}(line):\n    return _record(\n" + "\n".join(values) + "\n    )\n"
+    else:
+        source = f"def _parse_t{record_type}(line):\n    return {{\n" + "\n".join(values) + "\n    }\n"
+    namespace = {'_parse_ach_int': _parse_ach_int, '_record': record_tuple}
+    exec(source, namespace)
+    return namespace[f"_parse_t{record_type}"]
+
+# Generated parsers, indexed like _LAYOUTS
+_PARSERS = [None] * 10
+_TUPLE_PARSERS = [None] * 10
+_IN_PLACE_PARSERS = [None] * 10
+for _record_type, _layout in enumerate(_LAYOUTS):
+    if _layout is not None:
+        _PARSERS[_record_type] = _compile_parser(_record_type, _layout)
+        _TUPLE_PARSERS[_record_type] = _compile_parser(_record_type, _layout, RECORD_TUPLES[str(_record_type)])
+        _IN_PLACE_PARSERS[_record_type] = _compile_parser(_record_type, _layout, in_place=True)
+
+def _parse_line(line, parsers):
+    """parse_record, with the per-record-type parsers to use."""
     if not line or len(line) < 1: # Basic check for empty or too short lines
         return None, None # Or raise an error
 
     record_type = line[0]
-    definition = RECORD_DEFINITIONS.get(record_type)
+    if '0' <= record_type <= '9':
+        parser = parsers[ord(record_type) - 48]
+    else:
+        parser = None
 
-    if not definition:
+    if not parser:
         # Handle unknown record types or '9' filled lines at the end of blocks
-        if record_type == '9' and all(c == '9' for c in line): # Common filler
-            return "filler", {"raw_line": line.strip()}
-        print(f"Warning: Unknown or unhandled record type '{record_type}' for line: {line.strip()}")
-        return "unknown", {"raw_line": line.strip()}
-
-    parsed = {}
-    for field_name, (start, end, description) in definition.items():
-        # Ensure slicing does not go out of bounds if line is unexpectedly short
-        # (though ACH lines should be 94 chars)
-        value = line[start:min(end, len(line))].strip()
-        parsed[field_name] = value
-        # You might want to add type conversions here, e.g., for amounts, dates
-        if field_name in ['amount', 'total_debit_entry_dollar_amount', 'total_credit_entry_dollar_amount',
-                          'entry_addenda_count', 'entry_hash', 'batch_count', 'block_count',
-                          'total_debit_entry_dollar_amount_in_file', 'total_credit_entry_dollar_amount_in_file']:
-            try:
-                # Amounts are in cents, usually integers. Hashes can be large.
-                if 'amount' in field_name: # dollar amounts
-                     parsed[field_name] = int(value) if value else 0
-                elif 'hash' in field_name: # entry hashes
-                     parsed[field_name] = int(value) if value else 0
-                elif 'count' in field_name: # counts
-                     parsed[field_name] = int(value) if value else 0
-
-            except ValueError:
-                # print(f"Warning: Could not convert field '{field_name}' value '{value}' to int.")
-                pass # Keep as string if conversion fails, or handle error
-
-    return record_type, parsed
+        raw_line = line.strip()
+        if record_type == '9' and not line.strip('9'): # Common filler
+            return "filler", {"raw_line": raw_line}
+        print(f"Warning: Unknown or unhandled record type '{record_type}' for line: {raw_line}")
+        return "unknown", {"raw_line": raw_line}
 
-def parse_ach_file_content(ach_content):
+    # Slicing clamps to the line length if the line is unexpectedly short
+    # (though ACH lines should be 94 chars)
+    return record_type, parser(line)
+
+def parse_record(line):
+    """Parses a single 94-character ACH record."""
+    return _parse_line(line, _PARSERS)
+
+def parse_record_tuple(line):
     """
-    Parses the string content of an ACH file.
-    The content can be a single string with newlines, or a list of lines.
+    Parses a single 94-character ACH record into the matching RECORD_TUPLES
+    namedtuple (use ._asdict() where a dict is needed, e.g. for JSON).
+    Filler and unknown lines are returned as dicts, as by parse_record.
     """
-    ach_data = {
-        "file_header": None,
-        "batches": [],
-        "file_control": None,
-        "errors": [],
-        "other_records": [] # For fillers or unknown types
-    }
-    current_batch = None
-    current_entry = None
+    return _parse_line(line, _TUPLE_PARSERS)
+
+def _parse_int_column(rows, start, end):
+    """
+    Parses rows[:, start:end] for a 2-D uint8 array of records as int64. Returns
+    (values, valid): fields that are all ASCII digits, the normal zero-padded case,
+    are converted together with one astype() on the contiguous column bytes.
+    Anything else (blank-padded, blank, non-numeric) is left invalid, and the
+    caller converts those cells the slow way.
+    """
+    field = np.ascontiguousarray(rows[:, start:end])
+    valid = ((field >= 48) & (field <= 57)).all(axis=1)
+    values = np.zeros(len(field), dtype=np.int64)
+    values[valid] = field[valid].view(f'S{end - start}').ravel().astype(np.int64)
+    return values, valid
+
+# Records per _record_array check, bounding its temporaries to about a megabyte
+_CHECK_BLOCK_ROWS = 4096
+
+def _record_array(ach_content):
+    """
+    Views ACH content (bytes or an mmap) as an (N, 94) uint8 array, one row per
+    record, without copying it. Returns None if NumPy is unavailable or the
+    content is not a clean run of printable 94-character records, LF- or
+    CRLF-separated or continuous. The row stride (arr.strides[0]) is 95, 96 or 94
+    respectively.
+    """
+    if np is None or not ach_content:
+        return None
+
+    buf = np.frombuffer(ach_content, dtype=np.uint8)
+    # The line ending, if any, is whatever follows the first record
+    if buf[94:96].tobytes() == b'\r\n':
+        separator = buf[94:96]
+    elif buf[94:95].tobytes() == b'\n':
+        separator = buf[94:95]
+    else: # Continuous block of 94-character records
+        separator = buf[:0]
+    stride = 94 + len(separator)
+
+    # Every separator must close a 94-character record, and the last record may
+    # or may not have one
+    n = -(-len(buf) // stride)
+    if len(buf) not in (n * stride, n * stride - len(separator)):
+        return None
+    arr = np.lib.stride_tricks.as_strided(buf, shape=(n, 94), strides=(stride, 1), writeable=False)
+    separators = np.lib.stride_tricks.as_strided(
+        buf[94:], shape=(len(buf) // stride, len(separator)), strides=(stride, 1), writeable=False
+    )
+
+    # Checked _CHECK_BLOCK_ROWS records at a time: comparing the whole file at
+    # once would allocate boolean temporaries larger than the file itself
+    for first in range(0, n, _CHECK_BLOCK_ROWS):
+        if (separators[first:first + _CHECK_BLOCK_ROWS] != separator).any():
+            return None
+        # Control characters (tabs, NULs, ...) strip differently as bytes than as str
+        block = arr[first:first + _CHECK_BLOCK_ROWS]
+        if ((block < 32) | (block > 126)).any():
+            return None
+    return arr
+
+def _parse_columns(rows, layout):
+    """
+    Parses the fields of rows, a 2-D uint8 array of records of one type (see
+    _record_array), column by column: each field is extracted as one 2-D slice
+    instead of being sliced on every line. Returns {field_name: column}: numeric
+    columns are int64 arrays, or lists if some field is not an integer (kept as a
+    string, as by parse_record); text columns are lists of str.
+    """
+    columns = {}
+    for field_name, start, end, convert, strip in layout:
+        if convert is not None:
+            values, valid = _parse_int_column(rows, start, end)
+            if not valid.all():
+                values = values.tolist()
+                for row in np.flatnonzero(~valid).tolist():
+                    values[row] = _parse_ach_int(rows[row].tobytes().decode('ascii'), start, end)
+                # Integers after all (e.g. padded with blanks): an array, as in
+                # parse_ach_file_columnar's record by record path
+                if all(type(value) is int for value in values):
+                    values = np.array(values, dtype=np.int64)
+        else:
+            # One decode for the whole column, then sliced per record: faster
+            # than np.char.decode / np.char.strip on every cell
+            text = np.ascontiguousarray(rows[:, start:end]).tobytes().decode('ascii')
+            width = end - start
+            if strip:
+                values = [text[i:i + width].strip() for i in range(0, len(text), width)]
+            else:
+                values = [text[i:i + width] for i in range(0, len(text), width)]
+        columns[field_name] = values
+    return columns
+
+class _FixedWidthLines:
+    """
+    The 94-character records of ACH content held in one block, as a read-only
+    sequence of str. Records are sliced (and decoded, for bytes or an mmap) only
+    when indexed, so the content is never split up front. stride is 94 for a
+    continuous block, 95 for LF- and 96 for CRLF-separated records.
+    """
+
+    def __init__(self, content, width=94, stride=94):
+        self.content = content
+        self.width = width
+        self.stride = stride
+
+    def __len__(self):
+        return -(-len(self.content) // self.stride) # Last record may be short
+
+    def __getitem__(self, index):
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        start = index * self.stride
+        line = self.content[start:start + self.width]
+        if not isinstance(line, str):
+            line = line.decode('ascii')
+        return line
 
+def _split_lines(ach_content):
+    """
+    Returns the lines of ACH content given as a str or a list of lines, as an
+    indexable sequence.
+    """
     # Handle if ach_content is a single block of text without newlines
     # or if it's already split into lines
-    lines = []
     if isinstance(ach_content, str):
         if '\n' in ach_content:
             lines = ach_content.splitlines()
         else:
-            # Assume it's a continuous block, split into 94-char chunks
-            for i in range(0, len(ach_content), 94):
-                lines.append(ach_content[i:i+94])
-    elif isinstance(ach_content, list):
-        lines = ach_content
+            # Assume it's a continuous block of 94-char records, sliced on access
+            lines = _FixedWidthLines(ach_content)
     else:
-        ach_data["errors"].append("Invalid ACH content type. Expected string or list of strings.")
-        return ach_data
-
+        lines = ach_content
+    return lines
 
+def _iter_records(lines, parsers=_PARSERS):
+    """
+    Yields (line_number, record_type, parsed_record) for each non-empty line, in
+    order. Problems with a line itself (wrong length, unparsable) are yielded as
+    (line_number, "error", message). Lines are parsed with parsers (see
+    _parse_line).
+    """
     for i, line in enumerate(lines):
         line_number = i + 1
-        if len(line.strip()) == 0: # Skip empty lines
+        stripped = line.strip() # Stripped once, for the checks and error messages below
+        if not stripped: # Skip empty lines
             continue
-        if len(line) != 94 and not (line.startswith('9') and all(c == '9' for c in line.strip())): # Allow full filler lines
+        if len(line) != 94 and not (line.startswith('9') and not stripped.strip('9')): # Allow full filler lines
              # Allow lines shorter than 94 if they are filler lines (all '9's)
-            is_filler_line_strict = all(c == '9' for c in line)
+            is_filler_line_strict = not line.strip('9')
             if not is_filler_line_strict: # Only add error if not a pure filler line
-                ach_data["errors"].append(f"Line {line_number}: Expected 94 characters, got {len(line)}. Content: '{line.strip()}'")
+                yield line_number, "error", f"Line {line_number}: Expected 94 characters, got {len(line)}. Content: '{stripped}'"
                 # continue # Optionally skip malformed lines
 
-        record_type, parsed_record = parse_record(line)
+        record_type, parsed_record = _parse_line(line, parsers)
 
         if not parsed_record: # Error during parsing or empty line
-            ach_data["errors"].append(f"Line {line_number}: Could not parse line. Content: '{line.strip()}'")
+            yield line_number, "error", f"Line {line_number}: Could not parse line. Content: '{stripped}'"
             continue
 
-        if record_type == '1': # File Header
-            ach_data['file_header'] = parsed_record
-        elif record_type == '5': # Batch Header
-            if current_batch: # Should not happen if file is well-formed
-                ach_data["errors"].append(f"Line {line_number}: Unexpected Batch Header. Previous batch not closed.")
-            current_batch = parsed_record
-            current_batch['entries'] = []
-            ach_data['batches'].append(current_batch)
-        elif record_type == '6': # Entry Detail
-            if not current_batch:
-                ach_data["errors"].append(f"Line {line_number}: Entry Detail Record found outside of a batch.")
-                continue
-            current_entry = parsed_record
-            current_entry['addenda'] = []
-            current_batch['entries'].append(current_entry)
-        elif record_type == '7': # Addenda
-            if not current_entry:
-                ach_data["errors"].append(f"Line {line_number}: Addenda Record found without a preceding Entry Detail.")
-                continue
-            # Link addenda to the last entry detail record
-            # The trace number or sequence number in addenda should match the entry
-            entry_detail_seq_from_addenda = parsed_record.get('entry_detail_sequence_number')
-            if entry_detail_seq_from_addenda and current_entry.get('trace_number', '').endswith(entry_detail_seq_from_addenda):
-                 current_entry['addenda'].append(parsed_record)
-            else:
-                # Fallback: if no current_entry or sequence numbers don't match specific logic,
-                # try to find the correct entry in the current batch if possible, or log an error.
-                # For simplicity here, we'll append to the last entry if it exists.
-                # A more robust solution would match based on trace numbers.
-                if current_batch and current_batch['entries']:
-                    current_batch['entries'][-1]['addenda'].append(parsed_record)
-                else:
-                    ach_data["errors"].append(f"Line {line_number}: Could not associate Addenda with an Entry. Addenda: {parsed_record}")
-
-
-        elif record_type == '8': # Batch Control
-            if not current_batch:
-                ach_data["errors"].append(f"Line {line_number}: Batch Control Record found outside of a batch context.")
-                continue
-            current_batch['batch_control'] = parsed_record
-            current_batch = None # Reset for the next batch
-            current_entry = None # Reset current entry as batch is closing
-        elif record_type == '9': # File Control (or filler)
-            if 'raw_line' in parsed_record and all(c == '9' for c in parsed_record['raw_line']):
-                ach_data['other_records'].append({"type": "filler", "data": parsed_record})
-            elif 'batch_count' in parsed_record: # It's a File Control record
-                ach_data['file_control'] = parsed_record
-                # End of file essentially
-            else: # Should be the actual file control
-                 ach_data['file_control'] = parsed_record
-
-        elif record_type == "filler":
-            ach_data['other_records'].append({"type": "filler", "data": parsed_record})
-        elif record_type == "unknown":
-            ach_data['other_records'].append({"type": "unknown", "data": parsed_record})
-            ach_data["errors"].append(f"Line {line_number}: Encountered an unknown record type. Data: {parsed_record}")
+        yield line_number, record_type, parsed_record
+
+def _reusing_parsers():
+    """_IN_PLACE_PARSERS, each bound to a dict of its own to refill per record."""
+    return [
+        None if parser is None else partial(parser, dict.fromkeys(RECORD_DEFINITIONS[str(record_type)]))
+        for record_type, parser in enumerate(_IN_PLACE_PARSERS)
+    ]
+
+def iter_ach_records(source, reuse_records=False):
+    """
+    Yields (record_type, parsed_record) for each record of an ACH file, one at a
+    time, without building the file/batch/entry structure. Callers that only
+    aggregate (totals, entry counts) need not hold every record in memory.
+
+    source is a string or list of lines, as for parse_ach_file_content, or any
+    other iterable of lines such as an open text file (line endings are removed).
+    Only such iterables are read one line at a time: a string with newlines is
+    split into a list of lines (though not records) before the first yield, and
+    a list is already held by the caller. Line-level problems are yielded as
+    ("error", message); filler and unknown lines as by parse_record.
+
+    With reuse_records, every record of a given type is parsed into the same dict,
+    refilled in place, instead of a new dict per record. The dict belongs to the
+    consumer only until the next record is requested: use it (or .copy() it)
+    before advancing the iterator.
+    """
+    parsers = _reusing_parsers() if reuse_records else _PARSERS
+    if isinstance(source, (str, list)):
+        lines = _split_lines(source)
+    else:
+        lines = (line.rstrip('\r\n') for line in source)
+    for _, record_type, parsed_record in _iter_records(lines, parsers):
+        yield record_type, parsed_record
+
+def parse_ach_file_content(ach_content):
+    """
+    Parses the string content of an ACH file.
+    The content can be a single string with newlines, or a list of lines.
+    """
+    if not isinstance(ach_content, (str, list)):
+        ach_data = _build_ach_data(())
+        ach_data["errors"].append("Invalid ACH content type. Expected string or list of strings.")
+        return ach_data
+
+    return _build_ach_data(_iter_records(_split_lines(ach_content)))
+
+# Handlers for _build_ach_data, one per record type. Each takes the line number,
+# the parsed record, the ach_data being built, and a state dict holding the open
+# 'batch' and the current 'entry'.
+
+def _handle_error(line_number, message, ach_data, state): # Problem with the line itself
+    ach_data["errors"].append(message)
+
+def _handle_file_header(line_number, parsed_record, ach_data, state):
+    ach_data['file_header'] = parsed_record
+
+def _handle_batch_header(line_number, parsed_record, ach_data, state):
+    if state['batch']: # Should not happen if file is well-formed
+        ach_data["errors"].append(f"Line {line_number}: Unexpected Batch Header. Previous batch not closed.")
+    state['batch'] = parsed_record
+    parsed_record['entries'] = []
+    ach_data['batches'].append(parsed_record)
+
+def _handle_entry_detail(line_number, parsed_record, ach_data, state):
+    current_batch = state['batch']
+    if not current_batch:
+        ach_data["errors"].append(f"Line {line_number}: Entry Detail Record found outside of a batch.")
+        return
+    state['entry'] = parsed_record
+    parsed_record['addenda'] = []
+    current_batch['entries'].append(parsed_record)
+
+def _handle_addenda(line_number, parsed_record, ach_data, state):
+    current_entry = state['entry']
+    if not current_entry:
+        ach_data["errors"].append(f"Line {line_number}: Addenda Record found without a preceding Entry Detail.")
+        return
+    # Link addenda to the last entry detail record
+    # The trace number or sequence number in addenda should match the entry
+    entry_detail_seq_from_addenda = parsed_record.get('entry_detail_sequence_number')
+    if entry_detail_seq_from_addenda and current_entry.get('trace_number', '').endswith(entry_detail_seq_from_addenda):
+         current_entry['addenda'].append(parsed_record)
+    else:
+        # Fallback: if no current_entry or sequence numbers don't match specific logic,
+        # try to find the correct entry in the current batch if possible, or log an error.
+        # For simplicity here, we'll append to the last entry if it exists.
+        # A more robust solution would match based on trace numbers.
+        current_batch = state['batch']
+        if current_batch and current_batch['entries']:
+            current_batch['entries'][-1]['addenda'].append(parsed_record)
+        else:
+            ach_data["errors"].append(f"Line {line_number}: Could not associate Addenda with an Entry. Addenda: {parsed_record}")
+
+def _handle_batch_control(line_number, parsed_record, ach_data, state):
+    current_batch = state['batch']
+    if not current_batch:
+        ach_data["errors"].append(f"Line {line_number}: Batch Control Record found outside of a batch context.")
+        return
+    current_batch['batch_control'] = parsed_record
+    state['batch'] = None # Reset for the next batch
+    state['entry'] = None # Reset current entry as batch is closing
+
+def _handle_file_control(line_number, parsed_record, ach_data, state): # File Control (or filler)
+    if 'raw_line' in parsed_record and not parsed_record['raw_line'].strip('9'):
+        ach_data['other_records'].append({"type": "filler", "data": parsed_record})
+    elif 'batch_count' in parsed_record: # It's a File Control record
+        ach_data['file_control'] = parsed_record
+        # End of file essentially
+    else: # Should be the actual file control
+         ach_data['file_control'] = parsed_record
+
+def _handle_filler(line_number, parsed_record, ach_data, state):
+    ach_data['other_records'].append({"type": "filler", "data": parsed_record})
+
+def _handle_unknown(line_number, parsed_record, ach_data, state):
+    ach_data['other_records'].append({"type": "unknown", "data": parsed_record})
+    ach_data["errors"].append(f"Line {line_number}: Encountered an unknown record type. Data: {parsed_record}")
+
+_HANDLERS = {
+    "error": _handle_error,
+    '1': _handle_file_header,
+    '5': _handle_batch_header,
+    '6': _handle_entry_detail,
+    '7': _handle_addenda,
+    '8': _handle_batch_control,
+    '9': _handle_file_control,
+    "filler": _handle_filler,
+    "unknown": _handle_unknown,
+}
+
+def _build_ach_data(numbered_records):
+    """
+    Builds the file/batch/entry/addenda structure from the
+    (line_number, record_type, parsed_record) items of _iter_records.
+    """
+    ach_data = {
+        "file_header": None,
+        "batches": [],
+        "file_control": None,
+        "errors": [],
+        "other_records": [] # For fillers or unknown types
+    }
+    state = {'batch': None, 'entry': None}
 
+    for line_number, record_type, parsed_record in numbered_records:
+        handler = _HANDLERS.get(record_type)
+        if handler is not None:
+            handler(line_number, parsed_record, ach_data, state)
 
     return ach_data
 
-def parse_ach_lob_file(file_path):
+def parse_ach_file_content_bytes(ach_bytes, encoding='ascii'):
     """
-    Reads an ACH file (potentially from a .lob DB2 export containing raw ACH text)
-    and parses its content.
+    Parses the content of an ACH file given as bytes or a bytes-like buffer such
+    as an mmap, without decoding the whole file first. Clean ASCII content (see
+    _record_array) is read straight from the buffer, one record at a time;
+    anything else is decoded with encoding, ignoring invalid bytes, with universal
+    newlines, as reading the file in text mode would. For a str, use
+    parse_ach_file_content.
+    """
+    if isinstance(ach_bytes, str):
+        raise TypeError("parse_ach_file_content_bytes expects bytes or a bytes-like buffer; use parse_ach_file_content for str")
+    arr = _record_array(ach_bytes)
+    if arr is None:
+        # Decoded straight from the buffer, in one copy
+        content = str(ach_bytes, encoding, 'ignore')
+        if '\r' in content:
+            # splitlines() ends lines at '\r\n' and '\r' as well, like universal
+            # newlines, without first rewriting the content to '\n'
+            content = content.splitlines()
+        return parse_ach_file_content(content)
+
+    stride = arr.strides[0] # See _record_array
+    del arr # Release the view, so an mmap can be closed afterwards
+    return _build_ach_data(_iter_records(_FixedWidthLines(ach_bytes, stride=stride)))
+
+# Any byte that is not whitespace once decoded as ASCII with errors='ignore'
+# (non-ASCII bytes are dropped by the decode, so they count as blank too)
+_NON_BLANK_BYTE = re.compile(rb'[^\t\n\x0b\x0c\r\x1c-\x1f \x80-\xff]')
+
+# bytes.translate table from EBCDIC (cp037) to ASCII, for ACH files from
+# mainframe exports. Translating bytes to bytes is a single lookup-table pass and
+# keeps the content as bytes for parse_ach_file_content_bytes. cp037 maps all 256
+# byte values into Latin-1, so this is lossless; non-ASCII characters come out as
+# Latin-1 bytes. NEL (0x15), the EBCDIC line end, becomes a newline.
+_EBCDIC_TO_ASCII = bytes.maketrans(
+    bytes(range(256)),
+    bytes(range(256)).decode('cp037').replace('\x85', '\n').encode('latin-1')
+)
+
+def _probe_encoding(content):
+    """
+    Guesses the encoding of raw ACH content from its first byte alone. Every ACH
+    file starts with a record type digit: 0x30-0x39 in ASCII, 0xF0-0xF9 in EBCDIC.
+    Returns 'ascii', 'cp037' (the common US EBCDIC code page) or None if the
+    first byte is neither.
+    """
+    first_byte = content[:1]
+    if b'0' <= first_byte <= b'9':
+        return 'ascii'
+    if b'\xf0' <= first_byte <= b'\xf9':
+        return 'cp037'
+    return None
+
+def _open_ach_file(file_path):
+    """
+    Opens an ACH file for parsing. Returns (content, encoding, error): content is
+    ASCII bytes-like (the memory-mapped file, or its EBCDIC content translated to
+    bytes), encoding is the one for parse_ach_file_content_bytes to fall back to,
+    and error is an error message (content is then None) or None.
+    The caller closes content if it is an mmap.
     """
     try:
         # LOB files from DB2 might have specific encodings or could be binary.
-        # For ACH, the content should be ASCII or EBCDIC.
-        # We'll try reading as 'ascii' first, as NACHA is often ASCII.
-        # If it's EBCDIC, you'd need to decode it (e.g., using 'cp037' or 'cp500').
-        # This example assumes the .lob file contains plain text ACH data.
-        with open(file_path, 'r', encoding='ascii', errors='ignore') as f:
-            content = f.read()
-
-        # If the LOB file might be EBCDIC, you could try:
-        # with open(file_path, 'rb') as f_binary:
-        #     raw_bytes = f_binary.read()
-        # try:
-        #     content = raw_bytes.decode('ascii')
-        # except UnicodeDecodeError:
-        #     print("File is not ASCII, trying EBCDIC (cp037)...")
-        #     try:
-        #         content = raw_bytes.decode('cp037') # Common EBCDIC codepage
-        #     except UnicodeDecodeError:
-        #         print("Failed to decode as ASCII or EBCDIC. The file might be binary or use a different encoding.")
-        #         return {"errors": ["Failed to decode file content."]}
-
-
+        # For ACH, the content should be ASCII or EBCDIC, told apart by the first
+        # byte (see _probe_encoding) rather than by trying whole-file decodes.
+        # The file is memory-mapped rather than read and decoded up front, so
+        # large LOB exports are paged in by the OS as the parser touches them.
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0: # mmap cannot map an empty file
+                content = None
+            else:
+                content = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
     except FileNotFoundError:
-        return {"errors": [f"Error: File not found at {file_path}"]}
+        return None, None, f"Error: File not found at {file_path}"
     except Exception as e:
-        return {"errors": [f"Error reading file {file_path}: {e}"]}
+        return None, None, f"Error reading file {file_path}: {e}"
+
+    if content is not None and _probe_encoding(content) == 'cp037':
+        # EBCDIC: translate to ASCII bytes in one pass, keeping the bytes parser
+        with content:
+            raw = content[:].translate(_EBCDIC_TO_ASCII)
+        return raw, 'latin-1', None
+
+    # Otherwise ASCII, as before (also when the first byte is not a digit)
+    if content is None or not _NON_BLANK_BYTE.search(content):
+        if content is not None:
+            content.close()
+        return None, None, f"File {file_path} is empty or contains only whitespace."
+    return content, 'ascii', None
 
-    if not content.strip():
-        return {"errors": [f"File {file_path} is empty or contains only whitespace."]}
+def parse_ach_lob_file(file_path):
+    """
+    Reads an ACH file (potentially from a .lob DB2 export containing raw ACH text)
+    and parses its content.
+    """
+    content, encoding, error = _open_ach_file(file_path)
+    if error:
+        return {"errors": [error]}
+    try:
+        return parse_ach_file_content_bytes(content, encoding)
+    finally:
+        if isinstance(content, mmap.mmap):
+            content.close()
 
-    return parse_ach_file_content(content)
+def _parse_columns_numpy(content):
+    """
+    The NumPy path of parse_ach_file_columnar: None unless _record_array accepts
+    content. The returned columns are copies, so content can be closed afterwards.
+    """
+    arr = _record_array(content)
+    if arr is None:
+        return None
+    columns = {"errors": []}
+    types = arr[:, 0]
+    known = np.isin(types, np.frombuffer(''.join(RECORD_DEFINITIONS).encode('ascii'), dtype=np.uint8))
+    for row in np.flatnonzero(~known).tolist():
+        # Rare: parsed (and warned about) by parse_record, as by the fallback below
+        _, parsed_record = parse_record(arr[row].tobytes().decode('ascii'))
+        columns["errors"].append(f"Line {row + 1}: Encountered an unknown record type. Data: {parsed_record}")
+    # A record is in a batch from its header up to and including the batch
+    # control, i.e. if the last header comes after the last control before it
+    rows = np.arange(len(arr))
+    is_header = types == ord('5')
+    last_header = np.maximum.accumulate(np.where(is_header, rows, -1))
+    last_control = np.maximum.accumulate(np.where(types == ord('8'), rows, -1))
+    in_batch = last_header > np.concatenate(([-1], last_control[:-1]))
+    batch_index = np.where(in_batch, np.cumsum(is_header) - 1, -1)
+    for record_type in RECORD_DEFINITIONS:
+        row_indices = np.flatnonzero(types == ord(record_type))
+        if record_type == '9': # Leave out the all-'9' block filler
+            row_indices = row_indices[~(arr[row_indices] == ord('9')).all(axis=1)]
+        columns[record_type] = _parse_columns(arr[row_indices], _LAYOUTS[int(record_type)])
+        if record_type in '678':
+            columns[record_type]['batch_index'] = batch_index[row_indices]
+    return columns
+
+def parse_ach_file_columnar(file_path):
+    """
+    Parses an ACH file into columns rather than a tree of records, for callers
+    that aggregate numeric fields (control totals, entry counts, hashes).
+
+    Returns {record_type: {field_name: column}} for every record type in
+    RECORD_DEFINITIONS, plus "errors". Integer columns are int64 NumPy arrays
+    (array.array('q') without NumPy), or lists if some value is not an integer;
+    text columns are lists of str. Entry detail ('6'), addenda ('7') and batch
+    control ('8') records also get a 'batch_index' column: the position of their
+    batch header in the '5' columns, or -1 outside a batch (before the first
+    header, or after a batch control not followed by a new header), as the tree
+    built by parse_ach_lob_file sees it. Checking a batch control total is then
+    one sum per batch, e.g. with NumPy:
+
+        entries = columns['6']
+        entries['amount'][entries['batch_index'] == i].sum()
+
+    Unlike parse_ach_lob_file, which keeps a block filler line (all '9's) as
+    the file_control record when it parses as one, filler is left out of the
+    '9' columns here, so that they hold only real file control records.
+    Line-level problems and records of unknown type are reported in "errors".
+    """
+    content, encoding, error = _open_ach_file(file_path)
+    if error:
+        return {"errors": [error]}
+    try:
+        columns = _parse_columns_numpy(content)
+        if columns is not None:
+            return columns
+        # Not clean fixed-width content: collect the columns record by record,
+        # decoding as parse_ach_file_content_bytes does
+        text = str(content, encoding, 'ignore')
+    finally:
+        if isinstance(content, mmap.mmap):
+            content.close()
+    lines = _split_lines(text.splitlines() if '\r' in text else text)
+
+    columns = {"errors": []}
+    for record_type, definition in RECORD_DEFINITIONS.items():
+        columns[record_type] = {field_name: [] for field_name in definition}
+        if record_type in '678':
+            columns[record_type]['batch_index'] = []
+    batch_count = 0
+    batch_index = -1
+    for line_number, record_type, parsed_record in _iter_records(lines, _reusing_parsers()):
+        if record_type == "error":
+            columns["errors"].append(parsed_record)
+            continue
+        if record_type == "unknown":
+            columns["errors"].append(f"Line {line_number}: Encountered an unknown record type. Data: {parsed_record}")
+            continue
+        if record_type == "filler" or (record_type == '9' and not lines[line_number - 1].strip('9')): # Block filler
+            continue
+        if record_type == '5':
+            batch_index = batch_count
+            batch_count += 1
+        record_columns = columns[record_type]
+        for field_name, value in parsed_record.items():
+            record_columns[field_name].append(value)
+        if record_type in '678':
+            record_columns['batch_index'].append(batch_index)
+        if record_type == '8': # The batch is closed
+            batch_index = -1
+
+    for record_type in RECORD_DEFINITIONS:
+        record_columns = columns[record_type]
+        for field_name in list(record_columns):
+            if field_name == 'batch_index' or field_name in INTEGER_FIELDS:
+                values = record_columns[field_name]
+                if all(type(value) is int for value in values):
+                    record_columns[field_name] = np.array(values, dtype=np.int64) if np is not None else array('q', values)
+    return columns
 
 if __name__ == '__main__':
     # Create a dummy ACH file content for testing